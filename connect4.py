@@ -2,6 +2,7 @@ import json
 import os
 from collections import defaultdict
 import math # Import for infinity
+from events import BUS, RecordWriter, run_subscribers
 
 # --- Game Constants ---
 ROWS = 6
@@ -84,7 +85,8 @@ def load_leaderboard():
             # Ensure loaded data has the 'min_turns' key, or default it.
             leaderboard = defaultdict(lambda: default_stats.copy())
             for player, stats in data.items():
-                stats['min_turns'] = stats.get('min_turns', float('inf')) 
+                # "inf" is saved as a string, so convert it back before comparing turns
+                stats['min_turns'] = float(stats.get('min_turns', float('inf')))
                 leaderboard[player] = stats
                 
             return leaderboard
@@ -215,20 +217,25 @@ def play_game(player_names, leaderboard):
         turn += 1
 
         print_board(board)
+        BUS.publish("move", player=current_player_name, piece=piece, column=column, turn=turn)
 
         if check_win(board, piece):
             print(f"🎉 {current_player_name} ({piece}) wins in {turn} turns! Congratulations!")
             winner_name = current_player_name
             winning_turns = turn # Record the number of turns
             game_over = True
+            BUS.publish("win", player=winner_name, piece=piece, turns=turn, moves=(turn + 1) // 2)
         elif is_full(board):
             print("🤝 It's a draw!")
             game_over = True
+            BUS.publish("draw", players=list(player_names))
         # If no win/draw, loop continues and turn is already incremented
     
     # Update and save the leaderboard after the game ends
     # Pass the total number of turns
+    # This stays on the game thread so the menu always shows the saved result
     update_leaderboard(leaderboard, winner_name, winning_turns, player_names)
+    BUS.publish("leaderboard", standings={name: dict(leaderboard[name]) for name in player_names})
 
 
 def main_menu():
@@ -259,4 +266,8 @@ def main_menu():
 
 # --- Program Entry Point ---
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    subscribers = run_subscribers(BUS, RecordWriter())
+    try:
+        main_menu()
+    finally:
+        subscribers.close()
\ No newline at end of file
@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import messagebox
 import os
 from collections import defaultdict
+from events import BUS, RecordWriter, run_subscribers
 
 # --- Setup for Tkinter Popups (Needed for cross-platform dialogs) ---
 # Initialize Tkinter and hide the main window
@@ -87,6 +88,7 @@ def moves_file(winner_name=None, winning_moves=None, show_only=False):
     """
     Handles reading, updating, and displaying the leaderboard.
     Scores are based on the minimum number of moves to win.
+    Returns the sorted {name: moves} standings.
     """
     leaderboard = defaultdict(lambda: float('inf'))
 
@@ -137,6 +139,7 @@ def moves_file(winner_name=None, winning_moves=None, show_only=False):
             display_move = int(move) if move == int(move) else f"{move:.2f}"
             print(f"{rank}. {name}: {display_move} moves")
     print("="*40)
+    return sorted_moves
 
 # --- Matplotlib UI Logic ---
 
@@ -188,21 +191,26 @@ def on_click(event):
     if row is not None:
         drop_piece(board, row, col, current_player)
         move_count += 1
+        piece_name = 'X' if current_player == PIECE_X else 'O'
+        BUS.publish("move", player=player_names[current_player], piece=piece_name, column=col, turn=move_count)
         
         # Check game status
         if check_win(board, current_player):
             winner_name = player_names[current_player]
             winning_moves = (move_count + 1) // 2
             game_over = True
+            BUS.publish("win", player=winner_name, piece=piece_name, turns=move_count, moves=winning_moves)
             
             # Update leaderboard and show result/menu
-            moves_file(winner_name, winning_moves)
+            standings = moves_file(winner_name, winning_moves)
+            BUS.publish("leaderboard", standings=standings)
             
             # Use Tkinter popup for game end menu
             show_game_end_menu(f"🎉 {winner_name} wins in {winning_moves} moves! 🎉")
             
         elif is_full(board):
             game_over = True
+            BUS.publish("draw", players=list(player_names.values()))
             show_game_end_menu("🤝 It's a draw! 🤝")
             
         else:
@@ -278,6 +286,9 @@ if __name__ == '__main__':
     # Initial leaderboard display
     moves_file(show_only=True)
 
+    # Game records are written off the click handler by a bus subscriber
+    subscribers = run_subscribers(BUS, RecordWriter())
+
     # Initialize Matplotlib Figure and Axis
     fig, ax = plt.subplots(figsize=(COLUMNS, ROWS))
     fig.canvas.manager.set_window_title('Connect Four')
@@ -289,5 +300,8 @@ if __name__ == '__main__':
     reset_game() 
 
     # Show the plot and start the event loop
-    plt.show()
+    try:
+        plt.show()
+    finally:
+        subscribers.close()
 
@@ -0,0 +1,345 @@
+import asyncio
+import itertools
+import json
+import math
+import threading
+import time
+from collections import Counter, deque
+
+# --- Event Bus Constants ---
+QUEUE_SIZE = 256       # Events buffered per subscriber before dropping starts
+MAX_DROPPED = 64       # Drops in a row before a slow subscriber is disconnected
+MAX_PENDING = 4096     # Events a lossless subscriber may fall behind before dropping
+START_TIMEOUT = 5.0    # Seconds run_subscribers waits for its thread to start
+CLOSE_TIMEOUT = 5.0    # Seconds close() waits for subscribers to drain
+RECORDS_FILE = "game_records.jsonl"
+
+_CLOSED = object()  # Queue sentinel that ends a subscription
+
+# --- Subscriptions ---
+
+class Subscription:
+    """
+    A bounded queue of events for one consumer, bound to one asyncio loop.
+    With `drop`, a full queue drops events and a consumer that keeps falling
+    behind is disconnected. Without it, events wait in a backlog on the
+    consumer's side (never on the publisher), up to MAX_PENDING of them.
+    """
+
+    def __init__(self, bus, kinds, maxsize, max_dropped, loop, drop=True):
+        self.bus = bus
+        self.kinds = frozenset(kinds) if kinds else None
+        self.queue = asyncio.Queue(maxsize)
+        self.max_dropped = max_dropped
+        self.loop = loop
+        self.drop = drop
+        self.backlog = deque()  # Events waiting for room in the queue, in order
+        self.dropped = 0        # Drops since the last delivered event
+        self.total_dropped = 0
+        self.closed = False
+        self.finished = False   # The end marker has been consumed
+
+    def wants(self, event):
+        return not self.closed and (self.kinds is None or event["kind"] in self.kinds)
+
+    def _offer(self, event):
+        """Queues an event without waiting. Must run on self.loop."""
+        if not self.wants(event):
+            return
+        if not self.drop:
+            self._offer_lossless(event)
+            return
+        try:
+            self.queue.put_nowait(event)
+            self.dropped = 0
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.total_dropped += 1
+            if self.dropped > self.max_dropped:
+                # Too far behind to catch up: cut it loose instead of slowing the game
+                print(f"Event subscriber disconnected after dropping {self.dropped} events in a row.")
+                self.bus.unsubscribe(self)
+
+    def _offer_lossless(self, event):
+        # Once anything is waiting, later events go behind it to keep their order
+        if not self.backlog and not self.queue.full():
+            self.queue.put_nowait(event)
+            self.dropped = 0
+        elif len(self.backlog) < MAX_PENDING:
+            self.backlog.append(event)
+            self.dropped = 0
+        else:
+            if self.dropped == 0:
+                print(f"Event subscriber is {len(self.backlog)} events behind; dropping events until it catches up.")
+            self.dropped += 1
+            self.total_dropped += 1
+
+    def _refill(self):
+        while self.backlog and not self.queue.full():
+            self.queue.put_nowait(self.backlog.popleft())
+
+    def _close(self, drain=False):
+        """
+        Ends the subscription and wakes the consumer. With `drain`, events
+        already queued are still delivered first. Must run on self.loop.
+        """
+        self.closed = True
+        if not drain:
+            self.backlog.clear()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        if self.backlog or self.queue.full():
+            # Goes in behind the events still waiting for room
+            self.backlog.append(_CLOSED)
+        else:
+            self.queue.put_nowait(_CLOSED)
+
+    async def get(self):
+        """Waits for the next event. Returns None once the subscription is closed."""
+        if self.finished:
+            return None
+        event = await self.queue.get()
+        self._refill()
+        if event is _CLOSED:
+            self.finished = True
+            return None
+        return event
+
+    def ready_events(self):
+        """Returns the events already queued, without waiting."""
+        events = []
+        while not self.finished and not self.queue.empty():
+            event = self.queue.get_nowait()
+            self._refill()
+            if event is _CLOSED:
+                self.finished = True
+            else:
+                events.append(event)
+        return events
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+# --- Event Bus ---
+
+class EventBus:
+    """
+    In-process pub/sub for game events. Publishing never blocks the game loop:
+    each subscriber gets its own bounded queue. By default, events that don't
+    fit are dropped for that subscriber only and persistently slow subscribers
+    are disconnected; subscribers that must see every event (drop=False) get
+    back-pressure on their own loop instead.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def subscribe(self, kinds=None, maxsize=QUEUE_SIZE, max_dropped=MAX_DROPPED, loop=None, drop=True):
+        """
+        Registers a consumer. Call from the consumer's event loop, or pass it in.
+        `kinds` limits delivery to those event kinds (default: everything).
+        `drop=False` makes a full queue wait instead of dropping events.
+        """
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        subscription = Subscription(self, kinds, maxsize, max_dropped, loop, drop)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription, drain=False):
+        """Removes a consumer and ends its async iteration, after its backlog if `drain`."""
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers.remove(subscription)
+        self._call_on_loop(subscription, subscription._close, drain)
+
+    def publish(self, kind, **data):
+        """Fans an event out to every subscriber without waiting. Safe from any thread."""
+        event = {"seq": next(self._sequence), "time": time.time(), "kind": kind, **data}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.wants(event):
+                self._call_on_loop(subscription, subscription._offer, event)
+        return event
+
+    def _call_on_loop(self, subscription, callback, *args):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is subscription.loop:
+            callback(*args)
+            return
+        try:
+            subscription.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The consumer's loop has shut down
+            with self._lock:
+                if subscription in self._subscribers:
+                    self._subscribers.remove(subscription)
+
+# Shared bus used by the console, Matplotlib and web front ends
+BUS = EventBus()
+
+# --- Subscribers ---
+
+def _json_safe(value):
+    """Replaces inf/nan (e.g. an unset 'min_turns') with None so records stay valid JSON."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+class RecordWriter:
+    """
+    Appends every event as one JSON line to the game record file. File I/O
+    runs in a worker thread, a batch at a time, so it never stalls the other
+    subscribers on the same loop.
+    """
+
+    drop_events = False  # Records should be complete, so wait rather than drop
+
+    def __init__(self, path=RECORDS_FILE):
+        self.path = path
+
+    async def __call__(self, subscription):
+        try:
+            f = await asyncio.to_thread(open, self.path, "a")
+        except IOError as e:
+            print(f"Error opening game record file: {e}")
+            return
+        try:
+            while True:
+                event = await subscription.get()
+                if event is None:
+                    break
+                batch = [event] + subscription.ready_events()
+                lines = "".join(json.dumps(_json_safe(e), allow_nan=False) + "\n" for e in batch)
+                try:
+                    await asyncio.to_thread(self._write, f, lines)
+                except IOError as e:
+                    print(f"Error writing game record: {e}")
+        finally:
+            f.close()
+
+    @staticmethod
+    def _write(f, lines):
+        f.write(lines)
+        f.flush()
+
+async def spectator_feed(subscription, write=print):
+    """Narrates moves and results for spectators."""
+    async for event in subscription:
+        if event["kind"] == "move":
+            write(f"[live] {event['player']} ({event['piece']}) drops into column {event['column']} (turn {event['turn']})")
+        elif event["kind"] == "win":
+            write(f"[live] {event['player']} wins in {event['moves']} moves!")
+        elif event["kind"] == "draw":
+            write("[live] It's a draw!")
+
+class EventCounter:
+    """Metrics sink that counts events by kind."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    async def __call__(self, subscription):
+        async for event in subscription:
+            with self._lock:
+                self.counts[event["kind"]] += 1
+
+    def snapshot(self):
+        """Returns a copy of the counts that is safe to read from any thread."""
+        with self._lock:
+            return dict(self.counts)
+
+# --- Background Runner ---
+
+class SubscriberThread:
+    """Subscriber coroutines running on their own event loop in a daemon thread."""
+
+    def __init__(self, bus, subscribers):
+        self.bus = bus
+        self.subscribers = subscribers
+        self.subscriptions = []
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self, timeout=START_TIMEOUT):
+        """Starts the thread and returns once every subscriber is registered."""
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Event subscribers did not start in time.")
+        if self.error is not None:
+            raise self.error
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Lets every subscriber finish its queued events, then stops the thread."""
+        for subscription in list(self.subscriptions):
+            self.bus.unsubscribe(subscription, drain=True)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("Warning: event subscribers did not finish; some game records may be lost.")
+
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        finally:
+            # Never leave start() waiting, even if the loop itself failed
+            self._ready.set()
+
+    async def _main(self):
+        coroutines = []
+        try:
+            for subscriber in self.subscribers:
+                subscription = self.bus.subscribe(drop=getattr(subscriber, "drop_events", True))
+                self.subscriptions.append(subscription)
+                coroutine = subscriber(subscription)
+                if not asyncio.iscoroutine(coroutine):
+                    raise TypeError(f"Event subscriber {subscriber!r} must be an async function.")
+                coroutines.append((subscriber, subscription, coroutine))
+        except Exception as e:
+            self.error = e
+            for subscription in self.subscriptions:
+                self.bus.unsubscribe(subscription)
+            for _, _, coroutine in coroutines:
+                coroutine.close()
+            return
+        finally:
+            self._ready.set()
+        await asyncio.gather(*(self._watch(*started) for started in coroutines))
+
+    async def _watch(self, subscriber, subscription, coroutine):
+        try:
+            await coroutine
+        except Exception as e:
+            print(f"Event subscriber {subscriber!r} failed: {e}")
+        finally:
+            self.bus.unsubscribe(subscription)
+
+def run_subscribers(bus, *subscribers):
+    """
+    Runs each subscriber coroutine function on an event loop in a daemon
+    thread, so sync game loops can publish without owning a loop. A
+    subscriber with `drop_events = False` is subscribed with drop=False.
+    Returns the SubscriberThread; call close() on it at shutdown.
+    """
+    runner = SubscriberThread(bus, subscribers)
+    runner.start()
+    return runner
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import events
+from events import EventBus, EventCounter, RecordWriter, run_subscribers, spectator_feed
+
+
+def test_publish_fans_out_to_every_subscriber():
+    async def main():
+        bus = EventBus()
+        first, second = bus.subscribe(), bus.subscribe()
+        bus.publish("move", column=3)
+        return await first.get(), await second.get()
+
+    first, second = asyncio.run(main())
+    assert first["kind"] == second["kind"] == "move"
+    assert first["column"] == 3
+    assert first["seq"] == second["seq"]
+
+
+def test_kinds_filter_limits_delivery():
+    async def main():
+        bus = EventBus()
+        wins = bus.subscribe(kinds=["win"])
+        bus.publish("move")
+        bus.publish("win", player="a")
+        return await wins.get(), wins.queue.qsize()
+
+    event, left = asyncio.run(main())
+    assert event["kind"] == "win"
+    assert left == 0
+
+
+def test_full_queue_drops_only_for_that_subscriber():
+    async def main():
+        bus = EventBus()
+        small = bus.subscribe(maxsize=1)
+        roomy = bus.subscribe(maxsize=10)
+        for i in range(3):
+            bus.publish("move", turn=i)
+        return small, roomy
+
+    small, roomy = asyncio.run(main())
+    assert small.queue.qsize() == 1
+    assert small.dropped == small.total_dropped == 2
+    assert not small.closed
+    assert roomy.queue.qsize() == 3
+
+
+def test_drop_count_resets_after_a_delivery():
+    async def main():
+        bus = EventBus()
+        sub = bus.subscribe(maxsize=1, max_dropped=2)
+        bus.publish("a")
+        bus.publish("b")  # dropped
+        bus.publish("c")  # dropped
+        await sub.get()
+        bus.publish("d")  # delivered, resets the run of drops
+        bus.publish("e")  # dropped
+        bus.publish("f")  # dropped
+        return sub
+
+    sub = asyncio.run(main())
+    assert not sub.closed
+    assert sub.dropped == 2
+    assert sub.total_dropped == 4
+
+
+def test_slow_consumer_is_disconnected_and_logged(capsys):
+    async def main():
+        bus = EventBus()
+        slow = bus.subscribe(maxsize=2, max_dropped=3)
+        for i in range(10):
+            bus.publish("move", turn=i)
+        bus.publish("win")
+        return slow, [event async for event in slow]
+
+    slow, remaining = asyncio.run(main())
+    assert slow.closed
+    assert remaining == []
+    assert "disconnected" in capsys.readouterr().out
+
+
+def test_lossless_subscriber_waits_instead_of_dropping():
+    async def main():
+        bus = EventBus()
+        sub = bus.subscribe(maxsize=1, max_dropped=0, drop=False)
+        for i in range(5):
+            bus.publish("move", turn=i)
+        await asyncio.sleep(0)
+        bus.publish("win")
+        bus.unsubscribe(sub, drain=True)
+        return sub, [event.get("turn", event["kind"]) async for event in sub]
+
+    sub, received = asyncio.run(main())
+    assert received == [0, 1, 2, 3, 4, "win"]
+    assert sub.total_dropped == 0
+    assert not sub.backlog
+
+
+def test_lossless_subscriber_drops_past_max_pending_without_disconnecting(monkeypatch, capsys):
+    monkeypatch.setattr(events, "MAX_PENDING", 2)
+
+    async def main():
+        bus = EventBus()
+        sub = bus.subscribe(maxsize=1, drop=False)
+        for i in range(6):
+            bus.publish("move", turn=i)
+        received = [(await sub.get())["turn"] for _ in range(3)]
+        bus.publish("move", turn=6)
+        received.append((await sub.get())["turn"])
+        return sub, bus, received
+
+    sub, bus, received = asyncio.run(main())
+    assert received == [0, 1, 2, 6]
+    assert sub.total_dropped == 3
+    assert not sub.closed and sub in bus._subscribers
+    assert capsys.readouterr().out.count("behind") == 1
+
+
+def test_ready_events_returns_queued_events_without_waiting():
+    async def main():
+        bus = EventBus()
+        sub = bus.subscribe()
+        bus.publish("a")
+        bus.publish("b")
+        bus.unsubscribe(sub, drain=True)
+        ready = [event["kind"] for event in sub.ready_events()]
+        return ready, await sub.get()
+
+    assert asyncio.run(main()) == (["a", "b"], None)
+
+
+def test_record_writer_is_lossless_and_does_not_stall_other_subscribers(tmp_path, monkeypatch):
+    release = threading.Event()
+    real_write = RecordWriter._write
+
+    def slow_write(f, lines):
+        release.wait(5)
+        real_write(f, lines)
+
+    monkeypatch.setattr(RecordWriter, "_write", staticmethod(slow_write))
+    path = tmp_path / "records.jsonl"
+    counter = EventCounter()
+    bus = EventBus()
+    runner = run_subscribers(bus, RecordWriter(path), counter)
+    assert [s.drop for s in runner.subscriptions] == [False, True]
+
+    for i in range(5):
+        bus.publish("move", turn=i)
+    # The counter keeps up while the writer is stuck in its file write
+    deadline = time.monotonic() + 2
+    while counter.snapshot().get("move", 0) < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert counter.snapshot()["move"] == 5
+
+    release.set()
+    runner.close()
+    assert [json.loads(line)["turn"] for line in path.read_text().splitlines()] == [0, 1, 2, 3, 4]
+
+
+def test_publish_from_another_thread():
+    async def main():
+        bus = EventBus()
+        sub = bus.subscribe()
+        publisher = threading.Thread(target=bus.publish, args=("move",), kwargs={"turn": 1})
+        publisher.start()
+        event = await asyncio.wait_for(sub.get(), 2)
+        publisher.join()
+        return event
+
+    assert asyncio.run(main())["turn"] == 1
+
+
+def test_drained_unsubscribe_delivers_backlog_first():
+    async def main():
+        bus = EventBus()
+        sub = bus.subscribe(maxsize=2)
+        bus.publish("a")
+        bus.publish("b")
+        bus.unsubscribe(sub, drain=True)
+        bus.publish("c")
+        return [event["kind"] async for event in sub]
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+
+def test_run_subscribers_close_flushes_records(tmp_path):
+    path = tmp_path / "records.jsonl"
+    bus = EventBus()
+    runner = run_subscribers(bus, RecordWriter(path))
+    bus.publish("win", player="a", turns=7, moves=4)
+    bus.publish("leaderboard", standings={"b": {"wins": 0, "min_turns": float("inf")}})
+    runner.close()
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["kind"] for line in lines] == ["win", "leaderboard"]
+    assert json.loads(lines[1])["standings"]["b"]["min_turns"] is None
+    assert "Infinity" not in lines[1]
+
+
+def test_run_subscribers_raises_for_a_broken_subscriber():
+    def not_async(subscription):
+        return None
+
+    bus = EventBus()
+    with pytest.raises(TypeError):
+        run_subscribers(bus, EventCounter(), not_async)
+    assert bus._subscribers == []
+
+
+def test_run_subscribers_times_out_instead_of_hanging(monkeypatch):
+    monkeypatch.setattr(events.SubscriberThread, "_run", lambda self: None)
+    with pytest.raises(RuntimeError):
+        events.SubscriberThread(EventBus(), []).start(timeout=0.1)
+
+
+def test_counter_and_spectator_feed():
+    lines = []
+    counter = EventCounter()
+
+    async def feed(subscription):
+        await spectator_feed(subscription, write=lines.append)
+
+    bus = EventBus()
+    runner = run_subscribers(bus, counter, feed)
+    bus.publish("move", player="Alice", piece="X", column=2, turn=1)
+    bus.publish("win", player="Alice", piece="X", turns=7, moves=4)
+    runner.close()
+
+    assert counter.snapshot() == {"move": 1, "win": 1}
+    assert lines == [
+        "[live] Alice (X) drops into column 2 (turn 1)",
+        "[live] Alice wins in 4 moves!",
+    ]
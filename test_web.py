@@ -0,0 +1,298 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from events import run_subscribers
+import web
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    # update_leaderboard writes leader_board.txt to the working directory
+    monkeypatch.chdir(tmp_path)
+    web.games.clear()
+    yield
+    web.games.clear()
+
+
+def play_columns(game, columns):
+    """Plays alternating X/O moves from each player's own seat."""
+    seats = {"X": game.seat_token("X"), "O": game.seat_token("O")}
+    result = None
+    for column in columns:
+        result = game.play(seats[game.piece], column)
+        assert result[0], result[1]
+    return result
+
+
+def test_vertical_win_ends_game_and_records_total_turns():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    ok, message = play_columns(game, [0, 1, 0, 1, 0, 1, 0])
+
+    assert ok
+    assert game.game_over
+    assert game.winner == "Alice"
+    assert "wins in 4 moves" in message
+
+    with open("leader_board.txt") as f:
+        saved = json.load(f)
+    # Same unit as the console game: every piece dropped
+    assert saved["Alice"]["min_turns"] == 7
+    assert saved["Bob"]["games"] == 1
+
+
+def test_moves_after_game_over_are_rejected():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    play_columns(game, [0, 1, 0, 1, 0, 1, 0])
+    ok, _ = game.play(game.seat_token("O"), 2)
+    assert not ok
+
+
+def test_spectators_and_wrong_seat_cannot_move():
+    game = web.WebGame("g", ("Alice", "Bob"))
+
+    assert game.play(None, 0) == (False, "Spectators can't make moves.")
+    assert game.play("not-a-seat", 0)[0] is False
+    ok, message = game.play(game.seat_token("O"), 0)
+    assert not ok and "Alice" in message
+    assert game.moves == []
+
+
+def test_full_column_is_rejected():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    play_columns(game, [3] * web.engine.ROWS)
+    ok, message = game.play(game.seat_token(game.piece), 3)
+    assert not ok and "full" in message
+
+
+def test_diff_returns_only_unseen_moves():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    play_columns(game, [0, 1, 2])
+
+    diff = game.diff(game.generation, 1)
+    assert not diff["full"]
+    assert diff["since"] == 3
+    assert [(m["row"], m["col"]) for m in diff["moves"]] == [(0, 1), (0, 2)]
+    assert diff["moves"][0]["fill"] == "yellow"
+
+    assert game.diff(game.generation, 3)["moves"] == []
+
+
+def test_diff_is_full_for_stale_generation_or_future_since():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    play_columns(game, [0, 1])
+
+    stale = game.diff(game.generation - 1, 2)
+    assert stale["full"] and len(stale["moves"]) == 2
+
+    ahead = game.diff(game.generation, 5)
+    assert ahead["full"] and len(ahead["moves"]) == 2
+
+
+def test_reset_needs_a_seat_and_starts_a_new_generation():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    play_columns(game, [0, 1])
+    generation = game.generation
+
+    assert game.reset(None)[0] is False
+    assert len(game.moves) == 2
+
+    assert game.reset(game.seat_token("O"))[0] is True
+    assert game.moves == []
+    assert game.generation == generation + 1
+    assert game.diff(generation, 2)["full"]
+
+
+def test_svg_is_cached_until_the_next_move():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    first = game.svg()
+    assert game.svg() is first
+
+    play_columns(game, [0])
+    svg = game.svg()
+    assert svg is not first
+    # Row 0 is drawn at the bottom of the image
+    assert 'id="c0-0" data-col="0" cx="40" cy="440"' in svg and 'fill="red"' in svg
+
+
+def test_names_are_escaped_in_pages():
+    game = web.WebGame("g", ("<b>Alice</b>", "Bob"))
+    page = web.render_game_page(game, game.seat_token("X"))
+    assert "<b>Alice</b>" not in page
+    assert "&lt;b&gt;Alice&lt;/b&gt;" in page
+
+    play_columns(game, [0, 1, 0, 1, 0, 1, 0])
+    board = web.render_leaderboard()
+    assert "<b>Alice</b>" not in board
+    assert "&lt;b&gt;Alice&lt;/b&gt;" in board
+
+
+def test_spectator_page_is_read_only():
+    game = web.WebGame("g", ("Alice", "Bob"))
+    spectator = web.render_game_page(game)
+    assert "Spectating" in spectator
+    assert "replay()\">" not in spectator
+    assert "const seat = null;" in spectator
+
+    player = web.render_game_page(game, game.seat_token("O"))
+    assert "You are Bob (O)" in player
+    assert f'const seat = "{game.seat_token("O")}";' in player
+
+
+def test_new_game_evicts_finished_games_and_refuses_when_full(monkeypatch):
+    monkeypatch.setattr(web, "MAX_GAMES", 2)
+    first = web.new_game()
+    second = web.new_game()
+
+    assert web.new_game() is None
+
+    play_columns(first, [0, 1, 0, 1, 0, 1, 0])
+    third = web.new_game()
+    assert third is not None
+    assert web.get_game(first.game_id) is None
+    assert web.get_game(second.game_id) is second
+    assert web.get_game("unknown") is None
+
+
+def test_idle_and_abandoned_games_are_evicted_but_main_is_not(monkeypatch):
+    monkeypatch.setattr(web, "MAX_GAMES", 3)
+    main = web.new_game(game_id=web.MAIN_GAME)
+    played = web.new_game()
+    play_columns(played, [0])
+    fresh = web.new_game()
+    assert web.new_game() is None
+
+    # Nobody touched the unplayed game for a while
+    fresh.last_active -= web.ABANDONED_SECONDS
+    assert web.new_game() is not None
+    assert web.get_game(fresh.game_id) is None
+
+    # A game with moves is only evicted after the longer idle timeout
+    played.last_active -= web.ABANDONED_SECONDS
+    assert web.new_game() is None
+    played.last_active -= web.IDLE_SECONDS
+    main.last_active -= web.IDLE_SECONDS
+    play_columns(main, [0, 1, 0, 1, 0, 1, 0])
+    assert web.new_game() is not None
+    assert web.get_game(played.game_id) is None
+    assert web.get_game(web.MAIN_GAME) is main
+
+
+def test_activity_keeps_a_game_from_being_evicted(monkeypatch):
+    monkeypatch.setattr(web, "MAX_GAMES", 1)
+    game = web.new_game()
+    game.last_active -= web.ABANDONED_SECONDS
+    game.diff(game.generation, 0)
+    assert web.new_game() is None
+
+
+def test_long_polls_past_the_waiter_cap_return_at_once(monkeypatch):
+    monkeypatch.setattr(web, "MAX_WAITERS", 1)
+    game = web.WebGame("g", ("Alice", "Bob"))
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(game.diff(game.generation, 0, 5)))
+    waiter.start()
+    while game.waiters == 0:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    overflow = game.diff(game.generation, 0, 5)
+    assert time.monotonic() - started < 1
+    assert overflow["poll_delay"] == web.SHORT_POLL_SECONDS
+
+    play_columns(game, [0])
+    waiter.join(2)
+    assert results[0]["poll_delay"] == 0 and len(results[0]["moves"]) == 1
+    assert game.waiters == 0
+
+
+# --- HTTP handler ---
+
+@pytest.fixture
+def port():
+    server = web.ThreadingHTTPServer(("127.0.0.1", 0), web.Connect4Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read().decode("utf-8")
+    finally:
+        conn.close()
+
+
+def post_form(port, path, body):
+    return request(port, "POST", path, body, {"Content-Type": "application/x-www-form-urlencoded"})
+
+
+def test_routes(port):
+    game = web.new_game(("Alice", "Bob"), game_id=web.MAIN_GAME)
+
+    status, page = request(port, "GET", "/")
+    assert status == 200 and '/game/main"' in page
+    assert request(port, "GET", "/game/main")[0] == 200
+    status, svg = request(port, "GET", "/game/main/board.svg")
+    assert status == 200 and svg.startswith("<svg")
+    assert request(port, "GET", "/leaderboard")[0] == 200
+    assert request(port, "GET", "/game/unknown")[0] == 404
+    assert request(port, "GET", "/game/unknown/diff")[0] == 404
+    assert post_form(port, "/game/unknown/move", "column=0")[0] == 404
+    assert request(port, "GET", "/game/main/diff?since=x")[0] == 400
+
+    status, body = post_form(port, "/game/main/move", f"seat={game.seat_token('X')}&column=2")
+    assert status == 200 and json.loads(body)["ok"]
+    status, body = post_form(port, "/game/main/move", "column=3")
+    assert json.loads(body) == {"ok": False, "message": "Spectators can't make moves."}
+    assert post_form(port, "/game/main/move", f"seat={game.seat_token('O')}&column=x")[0] == 400
+
+    status, body = request(port, "GET", "/game/main/diff?generation=0&since=0")
+    assert status == 200 and json.loads(body)["full"]
+
+    status, page = post_form(port, "/new", "")
+    assert status == 200 and "Game created" in page
+
+
+def test_bad_content_length_is_rejected(port):
+    web.new_game(game_id=web.MAIN_GAME)
+    assert request(port, "POST", "/game/main/move", headers={"Content-Length": "abc"})[0] == 400
+    assert request(port, "POST", "/game/main/move", headers={"Content-Length": "-1"})[0] == 400
+    oversized = "column=0&pad=" + "x" * web.MAX_FORM_BYTES
+    assert post_form(port, "/game/main/move", oversized)[0] == 400
+
+
+def test_wait_long_poll_returns_on_the_next_move(port):
+    game = web.new_game(game_id=web.MAIN_GAME)
+    replies = []
+    poller = threading.Thread(target=lambda: replies.append(
+        request(port, "GET", f"/game/main/diff?generation={game.generation}&since=0&wait=1")))
+    poller.start()
+    while game.waiters == 0:
+        time.sleep(0.01)
+
+    post_form(port, "/game/main/move", f"seat={game.seat_token('X')}&column=4")
+    poller.join(5)
+    status, body = replies[0]
+    assert status == 200
+    assert json.loads(body)["moves"] == [{"row": 0, "col": 4, "fill": "red"}]
+
+
+def test_metrics_counts_bus_events(port):
+    game = web.new_game(game_id=web.MAIN_GAME)
+    before = web.metrics.snapshot().get("move", 0)
+    subscribers = run_subscribers(web.BUS, web.metrics)
+    post_form(port, "/game/main/move", f"seat={game.seat_token('X')}&column=0")
+    subscribers.close()
+
+    status, body = request(port, "GET", "/metrics")
+    assert status == 200
+    assert json.loads(body)["move"] == before + 1
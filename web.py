@@ -0,0 +1,504 @@
+import argparse
+import html
+import json
+import secrets
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import board as engine
+from connect4 import load_leaderboard, update_leaderboard
+from events import BUS, RECORDS_FILE, EventCounter, RecordWriter, run_subscribers, spectator_feed
+
+# --- Web Front End Constants ---
+HOST = "127.0.0.1"
+PORT = 8000
+CELL_SIZE = 80
+PIECE_COLORS = {engine.EMPTY: "white", "X": "red", "O": "yellow"}
+LONG_POLL_SECONDS = 25.0
+MAX_WAITERS = 32       # Long-polls parked per game; further viewers short-poll instead
+SHORT_POLL_SECONDS = 2.0
+MAX_GAMES = 100        # Games kept in memory
+IDLE_SECONDS = 600     # A game nobody has played or watched for this long can be evicted
+ABANDONED_SECONDS = 60 # Same, for games that never had a move
+MAIN_GAME = "main"     # Created at startup and never evicted
+MAX_FORM_BYTES = 1024  # Largest POST body accepted
+
+# Every web game shares leader_board.txt, so load -> update -> save must not interleave
+leaderboard_lock = threading.Lock()
+
+# --- Game State (shared by every viewer of a game) ---
+
+class WebGame:
+    """
+    One Connect 4 game on the shared engine, watched by any number of browsers.
+    Each color has a secret seat token; viewers without one are spectators.
+    """
+
+    def __init__(self, game_id, player_names):
+        self.game_id = game_id
+        self.player_names = {"X": player_names[0], "O": player_names[1]}
+        self.seats = {secrets.token_urlsafe(8): "X", secrets.token_urlsafe(8): "O"}
+        self.changed = threading.Condition()
+        self.generation = 0
+        self.waiters = 0
+        self.last_active = time.monotonic()
+        self.new_round()
+
+    def seat_token(self, piece):
+        """Returns the seat token that plays `piece`."""
+        return next(token for token, seat_piece in self.seats.items() if seat_piece == piece)
+
+    def new_round(self):
+        """Starts a fresh game; viewers on an older generation get a full refresh."""
+        with self.changed:
+            self.board = engine.create_board()
+            self.moves = []  # (row, column, piece) in play order
+            self.piece = "X"
+            self.winner = None
+            self.game_over = False
+            self.message = self.turn_message()
+            self.generation += 1
+            self._svg = None
+            self.changed.notify_all()
+
+    def reset(self, seat):
+        """Replays the game if `seat` belongs to one of the players. Returns (ok, message)."""
+        if seat not in self.seats:
+            return False, "Only the players can start a new game."
+        self.last_active = time.monotonic()
+        self.new_round()
+        return True, self.message
+
+    def turn_message(self):
+        return f"Current Turn: {self.player_names[self.piece]} ({self.piece})"
+
+    def play(self, seat, column):
+        """Drops a piece for the player holding `seat`. Returns (ok, message)."""
+        result = None
+        with self.changed:
+            piece = self.seats.get(seat)
+            if piece is None:
+                return False, "Spectators can't make moves."
+            if self.game_over:
+                return False, "Game is over. Replay to start a new one."
+            if piece != self.piece:
+                return False, f"It's {self.player_names[self.piece]}'s turn."
+            self.last_active = time.monotonic()
+            if not 0 <= column < engine.COLUMNS:
+                return False, "Invalid column."
+            row = engine.get_available_row(self.board, column)
+            if row is None:
+                return False, "Column is full! Try a different one."
+
+            engine.drop_piece_at(self.board, row, column, piece)
+            self.moves.append((row, column, piece))
+            self._svg = None
+            BUS.publish("move", game=self.game_id, player=self.player_names[piece],
+                        piece=piece, column=column, turn=len(self.moves))
+
+            if engine.check_win(self.board, piece):
+                self.winner = self.player_names[piece]
+                winning_moves = (len(self.moves) + 1) // 2
+                self.game_over = True
+                self.message = f"🎉 {self.winner} wins in {winning_moves} moves! 🎉"
+                BUS.publish("win", game=self.game_id, player=self.winner, piece=piece,
+                            turns=len(self.moves), moves=winning_moves)
+                # The leaderboard counts every piece dropped, like the console game
+                result = (self.winner, len(self.moves))
+            elif engine.is_full(self.board):
+                self.game_over = True
+                self.message = "🤝 It's a draw! 🤝"
+                BUS.publish("draw", game=self.game_id, players=list(self.player_names.values()))
+                result = (None, None)
+            else:
+                self.piece = "O" if piece == "X" else "X"
+                self.message = self.turn_message()
+
+            self.changed.notify_all()
+            message = self.message
+
+        # Saved outside self.changed so long-polling viewers aren't held up by file I/O
+        if result is not None:
+            self.record_result(*result)
+        return True, message
+
+    def record_result(self, winner, winning_turns):
+        """Saves the finished game to the shared leaderboard and announces the change."""
+        players = list(self.player_names.values())
+        with leaderboard_lock:
+            leaderboard = load_leaderboard()
+            update_leaderboard(leaderboard, winner, winning_turns, players)
+        BUS.publish("leaderboard", game=self.game_id,
+                    standings={name: dict(leaderboard[name]) for name in players})
+
+    def diff(self, generation, since, timeout=0.0):
+        """
+        Returns the moves a viewer has not seen yet. Blocks up to `timeout`
+        seconds when there is nothing new, so idle viewers cost no traffic.
+        Each blocked viewer holds a server thread, so past MAX_WAITERS the
+        reply comes back at once and asks the viewer to poll again later.
+        """
+        poll_delay = 0.0
+        with self.changed:
+            self.last_active = time.monotonic()
+            if generation == self.generation and since >= len(self.moves) and timeout > 0:
+                if self.waiters < MAX_WAITERS:
+                    self.waiters += 1
+                    try:
+                        self.changed.wait_for(
+                            lambda: generation != self.generation or since < len(self.moves),
+                            timeout,
+                        )
+                    finally:
+                        self.waiters -= 1
+                else:
+                    poll_delay = SHORT_POLL_SECONDS
+            full = generation != self.generation or since > len(self.moves)
+            start = 0 if full else since
+            return {
+                "generation": self.generation,
+                "full": full,
+                "since": len(self.moves),
+                "moves": [
+                    {"row": r, "col": c, "fill": PIECE_COLORS[p]}
+                    for r, c, p in self.moves[start:]
+                ],
+                "message": self.message,
+                "game_over": self.game_over,
+                "poll_delay": poll_delay,
+            }
+
+    def svg(self):
+        """Returns the rendered board, re-rendered at most once per move."""
+        with self.changed:
+            if self._svg is None:
+                self._svg = render_board(self.board)
+            return self._svg
+
+# --- SVG Rendering ---
+
+@lru_cache(maxsize=None)
+def cell_fragment(row, column, piece):
+    """SVG markup for one hole; memoized since there are only ROWS*COLUMNS*3 variants."""
+    x = column * CELL_SIZE + CELL_SIZE // 2
+    # Row 0 is the bottom of the board in the engine
+    y = (engine.ROWS - 1 - row) * CELL_SIZE + CELL_SIZE // 2
+    return (
+        f'<circle id="c{row}-{column}" data-col="{column}" cx="{x}" cy="{y}" '
+        f'r="{int(CELL_SIZE * 0.42)}" fill="{PIECE_COLORS[piece]}"/>'
+    )
+
+def render_board(board):
+    """Builds the full board SVG from the memoized cell fragments."""
+    width = engine.COLUMNS * CELL_SIZE
+    height = engine.ROWS * CELL_SIZE
+    cells = "".join(
+        cell_fragment(r, c, board[r][c])
+        for r in range(engine.ROWS)
+        for c in range(engine.COLUMNS)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<rect width="{width}" height="{height}" fill="#0d47a1"/>{cells}</svg>'
+    )
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Connect Four</title>
+<style>body{{font-family:sans-serif;text-align:center}} .seated circle{{cursor:pointer}}</style>
+</head><body>
+<h2 id="message">{message}</h2>
+<p>{role}</p>
+<div id="board" class="{board_class}">{svg}</div>
+<p>{controls}<a href="/leaderboard" target="_blank">Leaderboard</a></p>
+<script>
+const base = "/game/{game_id}";
+const seat = {seat};
+let generation = {generation}, since = {since};
+function post(path, body) {{
+  return fetch(base + path, {{method: "POST", body: body,
+    headers: {{"Content-Type": "application/x-www-form-urlencoded"}}}})
+    .then(r => r.json()).then(r => {{ if (!r.ok) alert(r.message); }});
+}}
+if (seat) {{
+  document.getElementById("board").addEventListener("click", e => {{
+    const col = e.target.dataset.col;
+    if (col !== undefined) post("/move", "seat=" + seat + "&column=" + col);
+  }});
+}}
+function replay() {{ post("/reset", "seat=" + seat); }}
+async function follow() {{
+  while (true) {{
+    try {{
+      const r = await fetch(`${{base}}/diff?generation=${{generation}}&since=${{since}}&wait=1`);
+      const d = await r.json();
+      if (d.full) {{
+        document.getElementById("board").innerHTML = await (await fetch(base + "/board.svg")).text();
+      }}
+      for (const m of d.moves) {{
+        document.getElementById(`c${{m.row}}-${{m.col}}`).setAttribute("fill", m.fill);
+      }}
+      generation = d.generation; since = d.since;
+      document.getElementById("message").textContent = d.message;
+      if (d.poll_delay) await new Promise(res => setTimeout(res, d.poll_delay * 1000));
+    }} catch (err) {{
+      await new Promise(res => setTimeout(res, 2000));
+    }}
+  }}
+}}
+follow();
+</script></body></html>
+"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Connect Four</title></head>
+<body style="font-family:sans-serif;text-align:center">
+<h2>Connect Four</h2>
+<p><a href="/game/{main_game}">Watch the main game</a></p>
+<form method="post" action="/new"><button>Start a new game</button></form>
+<p><a href="/leaderboard">Leaderboard</a></p>
+</body></html>
+"""
+
+def render_game_page(game, seat=None):
+    """Renders the page for a seated player, or a read-only page for spectators."""
+    state = game.diff(0, 0)
+    piece = game.seats.get(seat)
+    if piece is None:
+        seat = None
+        role = "Spectating"
+        controls = ""
+    else:
+        role = f"You are {html.escape(game.player_names[piece])} ({piece})"
+        controls = '<button onclick="replay()">Replay</button> '
+    return PAGE_TEMPLATE.format(
+        game_id=game.game_id,
+        message=html.escape(state["message"]),
+        role=role,
+        board_class="seated" if seat else "",
+        controls=controls,
+        svg=game.svg(),
+        seat=json.dumps(seat),
+        generation=state["generation"],
+        since=state["since"],
+    )
+
+def render_seat_links(game):
+    """Lists the private player links and the public spectator link for a game."""
+    links = [
+        (f"{html.escape(game.player_names[piece])} ({piece})",
+         f"/game/{game.game_id}?seat={game.seat_token(piece)}")
+        for piece in ("X", "O")
+    ]
+    links.append(("Spectators", f"/game/{game.game_id}"))
+    items = "".join(f'<li>{label}: <a href="{url}">{url}</a></li>' for label, url in links)
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>New Game</title></head>'
+        "<body><h2>Game created</h2><p>Send each player their own link:</p>"
+        f"<ul>{items}</ul></body></html>"
+    )
+
+def render_leaderboard():
+    """Renders the shared leaderboard as an HTML table, best win rate first."""
+    rows = []
+    for name, stats in load_leaderboard().items():
+        win_percent = stats['wins'] / stats['games'] if stats['games'] > 0 else 0
+        rows.append((win_percent, stats['wins'], name, stats['games'], stats['min_turns']))
+    rows.sort(key=lambda p: (p[0], p[1]), reverse=True)
+
+    body = "".join(
+        f"<tr><td>{rank}</td><td>{html.escape(name)}</td><td>{wins}</td><td>{games}</td>"
+        f"<td>{win_percent:.2%}</td><td>{'N/A' if min_turns == float('inf') else int(min_turns)}</td></tr>"
+        for rank, (win_percent, wins, name, games, min_turns) in enumerate(rows, 1)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Leaderboard</title></head>'
+        "<body><h2>🏆 Connect 4 Leaderboard 🏆</h2><table border=\"1\">"
+        "<tr><th>Rank</th><th>Player</th><th>Wins</th><th>Games</th><th>Win %</th><th>Best Turn</th></tr>"
+        f"{body}</table></body></html>"
+    )
+
+# --- Game Registry ---
+
+# Counts bus events by kind for /metrics; fed by a subscriber started in __main__
+metrics = EventCounter()
+
+games = {}
+games_lock = threading.Lock()
+default_player_names = ("Player 1", "Player 2")
+
+def get_game(game_id):
+    """Returns the game with this id, or None if there is no such game."""
+    with games_lock:
+        return games.get(game_id)
+
+def evictable(game, now):
+    """Finished and abandoned games can make room; the main game always stays."""
+    if game.game_id == MAIN_GAME:
+        return False
+    idle = now - game.last_active
+    return game.game_over or idle >= IDLE_SECONDS or (not game.moves and idle >= ABANDONED_SECONDS)
+
+def new_game(player_names=None, game_id=None):
+    """
+    Creates a game. When MAX_GAMES are already kept, the least recently
+    active finished or idle game is evicted. Returns None if none can be.
+    """
+    with games_lock:
+        if len(games) >= MAX_GAMES:
+            now = time.monotonic()
+            candidates = [g for g in games.values() if evictable(g, now)]
+            if not candidates:
+                return None
+            del games[min(candidates, key=lambda g: g.last_active).game_id]
+        game_id = game_id or secrets.token_urlsafe(6)
+        game = WebGame(game_id, player_names or default_player_names)
+        games[game_id] = game
+        return game
+
+# --- HTTP Handler ---
+
+class Connect4Handler(BaseHTTPRequestHandler):
+    """
+    Routes: /, /new, /leaderboard, /metrics, /game/<id>[?seat=<token>], /game/<id>/board.svg,
+    /game/<id>/diff, /game/<id>/move, /game/<id>/reset.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        if not parts:
+            self.send_body(HOME_PAGE.format(main_game=MAIN_GAME), "text/html; charset=utf-8")
+            return
+        if parts == ["leaderboard"]:
+            self.send_body(render_leaderboard(), "text/html; charset=utf-8")
+            return
+        if parts == ["metrics"]:
+            self.send_json(metrics.snapshot())
+            return
+        if len(parts) not in (2, 3) or parts[0] != "game":
+            self.send_error(404)
+            return
+        game = get_game(parts[1])
+        if game is None:
+            self.send_error(404, "No such game")
+            return
+
+        if len(parts) == 2:
+            seat = query.get("seat", [None])[0]
+            self.send_body(render_game_page(game, seat), "text/html; charset=utf-8")
+        elif parts[2] == "board.svg":
+            self.send_body(game.svg(), "image/svg+xml")
+        elif parts[2] == "diff":
+            try:
+                generation = int(query.get("generation", ["0"])[0])
+                since = int(query.get("since", ["0"])[0])
+            except ValueError:
+                self.send_error(400, "generation and since must be integers")
+                return
+            timeout = LONG_POLL_SECONDS if query.get("wait") else 0.0
+            self.send_json(game.diff(generation, since, timeout))
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        form = self.read_form()
+        if form is None:
+            return
+
+        if parts == ["new"]:
+            game = new_game()
+            if game is None:
+                self.send_error(503, "Too many games in progress")
+                return
+            self.send_body(render_seat_links(game), "text/html; charset=utf-8")
+            return
+        if len(parts) != 3 or parts[0] != "game":
+            self.send_error(404)
+            return
+        game = get_game(parts[1])
+        if game is None:
+            self.send_error(404, "No such game")
+            return
+        seat = form.get("seat", [None])[0]
+
+        if parts[2] == "move":
+            try:
+                column = int(form.get("column", [""])[0])
+            except ValueError:
+                self.send_error(400, "column must be an integer")
+                return
+            ok, message = game.play(seat, column)
+            self.send_json({"ok": ok, "message": message})
+        elif parts[2] == "reset":
+            ok, message = game.reset(seat)
+            self.send_json({"ok": ok, "message": message})
+        else:
+            self.send_error(404)
+
+    def read_form(self):
+        """Parses a urlencoded POST body. Sends a 400 and returns None if it is malformed."""
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_FORM_BYTES:
+            self.send_error(400, "Bad Content-Length")
+            return None
+        return parse_qs(self.rfile.read(length).decode("utf-8", errors="replace"))
+
+    def send_body(self, text, content_type):
+        data = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, payload):
+        self.send_body(json.dumps(payload), "application/json")
+
+    def log_message(self, format, *args):
+        # Long-polling viewers would flood the console otherwise
+        pass
+
+# --- Main Application Setup ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Connect Four in the browser.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--player-x", default="Player 1", help="name for Player X (Red)")
+    parser.add_argument("--player-o", default="Player 2", help="name for Player O (Yellow)")
+    parser.add_argument("--records", default=RECORDS_FILE, help="file the game records are appended to")
+    parser.add_argument("--spectate", action="store_true", help="print a live feed of every game to this console")
+    args = parser.parse_args()
+    default_player_names = (args.player_x, args.player_o)
+
+    sinks = [RecordWriter(args.records), metrics]
+    if args.spectate:
+        sinks.append(spectator_feed)
+    subscribers = run_subscribers(BUS, *sinks)
+    server = ThreadingHTTPServer((args.host, args.port), Connect4Handler)
+    server.daemon_threads = True
+
+    base_url = f"http://{args.host}:{args.port}"
+    main_game = new_game(game_id=MAIN_GAME)
+    print(f"Connect Four is running at {base_url}/ (Ctrl+C to stop)")
+    for piece in ("X", "O"):
+        print(f"  {main_game.player_names[piece]} ({piece}): "
+              f"{base_url}/game/{MAIN_GAME}?seat={main_game.seat_token(piece)}")
+    print(f"  Spectators: {base_url}/game/{MAIN_GAME}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nThanks for playing! Goodbye.")
+    finally:
+        server.server_close()
+        subscribers.close()